@@ -1,10 +1,54 @@
-from flask import Flask
+import time
+
+from flask import Flask, g
 from flask_cors import CORS
 from flask_socketio import SocketIO
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins
+# Enable WebSockets. Handlers run inline so each client's audio chunks are fed
+# in arrival order; the recognizer itself runs in a background task.
+socketio = SocketIO(cors_allowed_origins="*", async_handlers=False)
+
+def create_app(warm_up=None):
+    """
+    Builds the single backend app: Speech-to-Text sockets and the /speak TTS
+    endpoint in one process, sharing the Google clients in app.clients.
+    With `warm_up` (default: config.CLIENT_WARM_UP) the clients are created and
+    connected before the first request instead of on it.
+    """
+    from app import clients, config
+    from app.log import setup_logging
+    from app.routes import main
+    from app.text_to_speech import tts
+
+    start = time.perf_counter()
+    log = setup_logging(config.LOG_LEVEL)
+    app = Flask(__name__)
+    CORS(app, resources={r"/*": {"origins": "*"}})  # Allow all origins
+
+    app.register_blueprint(main)
+    app.register_blueprint(tts)
+    socketio.init_app(app)
+
+    startup = {}
+    if config.CLIENT_WARM_UP if warm_up is None else warm_up:
+        try:
+            startup['warm_up'] = clients.warm_up()
+        except Exception as e:
+            # Clients are still created lazily on first use
+            log.warning("Client warm-up failed: %s", e)
+    startup['total'] = time.perf_counter() - start
+    app.config['STARTUP_TIMINGS'] = startup
+    log.info("Startup timings (s): %s", startup)
+
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
 
-socketio = SocketIO(app, cors_allowed_origins="*")  # Enable WebSockets
+    @app.after_request
+    def add_server_timing(response):
+        # Per-request latency, visible to clients and load tests (cold vs warm)
+        elapsed_ms = (time.perf_counter() - g.get('request_start', time.perf_counter())) * 1000
+        response.headers['Server-Timing'] = f"app;dur={elapsed_ms:.1f}"
+        return response
 
-from app import routes
\ No newline at end of file
+    return app
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+
+import google.auth
+import grpc
+from google.auth.transport.requests import Request
+from google.cloud import speech, texttospeech
+from google.cloud.speech_v1.services.speech.transports import SpeechGrpcTransport
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcTransport
+
+from app import config
+from app.metrics import stage_latency
+
+log = logging.getLogger(__name__)
+
+_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+# Shared, lazily created Google clients. gRPC clients are thread-safe, so one
+# channel per API serves every request and socket session in the process.
+_lock = threading.Lock()
+_credentials = None
+_speech_client = None
+_tts_client = None
+
+
+def _get_credentials():
+    global _credentials
+    if _credentials is None:
+        _credentials, _ = google.auth.default(scopes=_SCOPES)
+    return _credentials
+
+
+def _create(name, client_cls, transport_cls):
+    start = time.perf_counter()
+    channel = transport_cls.create_channel(
+        credentials=_get_credentials(),
+        options=config.GRPC_CHANNEL_OPTIONS,
+    )
+    client = client_cls(transport=transport_cls(channel=channel))
+    # Paid at startup with warm-up, otherwise by the first request that needs the client;
+    # exported as signify_stage_latency_seconds{stage="<name>_client_init"}
+    elapsed = time.perf_counter() - start
+    stage_latency.observe(elapsed, stage=f"{name}_client_init")
+    log.info("Created %s client in %.3fs", name, elapsed)
+    return client
+
+
+def get_speech_client():
+    global _speech_client
+    if _speech_client is None:
+        with _lock:
+            if _speech_client is None:
+                _speech_client = _create("speech", speech.SpeechClient, SpeechGrpcTransport)
+    return _speech_client
+
+
+def get_tts_client():
+    global _tts_client
+    if _tts_client is None:
+        with _lock:
+            if _tts_client is None:
+                _tts_client = _create("tts", texttospeech.TextToSpeechClient, TextToSpeechGrpcTransport)
+    return _tts_client
+
+
+def warm_up(timeout=config.CLIENT_WARM_UP_TIMEOUT):
+    """
+    Creates both clients, fetches an access token and waits for their gRPC
+    channels to connect, so the first real request skips that setup.
+    No recognition or synthesis is performed (nothing is billed).
+    Returns the seconds spent in each step.
+    """
+    timings = {}
+    start = time.perf_counter()
+    clients = [get_speech_client(), get_tts_client()]
+    timings["clients"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    credentials = _get_credentials()
+    if not credentials.valid:
+        credentials.refresh(Request())
+    timings["token"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for client in clients:
+        grpc.channel_ready_future(client.transport.grpc_channel).result(timeout=timeout)
+    timings["channels"] = time.perf_counter() - start
+    return timings
@@ -1,3 +1,49 @@
 import os
 
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "backend/deaf-app-key.json"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Google Cloud credentials; an existing GOOGLE_APPLICATION_CREDENTIALS takes precedence
+os.environ.setdefault("GOOGLE_APPLICATION_CREDENTIALS", os.path.join(BACKEND_DIR, "deaf-app-key.json"))
+
+# Shared Google clients
+GRPC_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.max_receive_message_length", 32 * 1024 * 1024),
+]
+CLIENT_WARM_UP = os.environ.get("CLIENT_WARM_UP", "1") not in ("0", "false")
+CLIENT_WARM_UP_TIMEOUT = 10.0   # Seconds to wait for each gRPC channel to connect
+
+# Observability
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+TRACE_SESSIONS = os.environ.get("TRACE_SESSIONS", "0") in ("1", "true")  # Trace IDs for every session, not just opted-in clients
+
+# Streaming recognition limits (per Socket.IO session)
+STREAM_BUFFER_BYTES = 16000 * 2 * 5   # 5s of 16 kHz LINEAR16; chunks that don't fit are dropped
+STREAM_REQUEST_BYTES = 16000           # Max audio per StreamingRecognizeRequest (0.5s)
+STREAM_HIGH_WATER = 0.75        # Buffer fill that triggers a `slow_down` to the client
+STREAM_SLOW_DOWN_INTERVAL = 0.5 # Min seconds between `slow_down` events per session
+STT_DELTA_INTERIMS = True       # Send interims as `transcript_delta` events instead of full text
+STT_DELTA_TICK = 0.1            # Min seconds between interim deltas (later hypotheses are coalesced)
+STREAM_IDLE_TIMEOUT = 10.0      # Seconds without audio before the stream is closed
+STREAM_MAX_DURATION = 290.0     # Google caps a single stream at ~305s
+
+# Voice activity gating (defaults; clients can override per session via `vad_config`)
+VAD_ENABLED = True
+VAD_FRAME_MS = 20
+VAD_ENERGY_THRESHOLD = 400.0    # Frame RMS (int16 units) treated as speech
+VAD_ZCR_THRESHOLD = 0.25        # Zero-crossing rate that marks quieter unvoiced speech
+VAD_HANGOVER_MS = 300           # Keep sending this long after speech stops
+VAD_PREROLL_MS = 200            # Replay this much audio from before speech starts
+
+# Synthesized speech cache
+TTS_CACHE_MEMORY_BYTES = 32 * 1024 * 1024
+TTS_CACHE_DIR = os.path.join(BACKEND_DIR, "tts_cache")
+TTS_CACHE_DISK_BYTES = 512 * 1024 * 1024
+
+# Streamed (segmented) speech synthesis
+TTS_STREAM_WORKERS = 8              # Shared threads for later segments of streamed requests
+TTS_STREAM_FIRST_WORKERS = 4        # Separate threads for each request's first segment
+TTS_STREAM_WINDOW = 2               # Segments of one request in flight at once (< TTS_STREAM_WORKERS)
+TTS_STREAM_MIN_SEGMENT_CHARS = 24   # Shorter clauses are merged with the next one
@@ -0,0 +1,30 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+_listener = None
+
+def setup_logging(level=logging.INFO):
+    """
+    Routes the `app` logger through a queue drained by a background thread,
+    so logging on the request/audio path never blocks on stdout/stderr.
+    Safe to call more than once.
+    """
+    global _listener
+    logger = logging.getLogger("app")
+    logger.setLevel(level)
+    if _listener is not None:
+        return logger
+
+    records = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.propagate = False
+    return logger
@@ -0,0 +1,135 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds (upper bounds), from sub-millisecond decode up to
+# multi-second recognition finals
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return [(self.name + _labels(self.label_names, key), value) for key, value in items]
+
+
+class Gauge:
+    """Value read from `fn` at scrape time, so the hot path never updates it."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def samples(self):
+        return [(self.name, self.fn())]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, optionally split by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self.lock:
+            items = sorted((key, list(series)) for key, series in self.series.items())
+        out = []
+        for key, series in items:
+            cumulative = 0
+            bounds = [repr(b) for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                out.append((self.name + "_bucket" + _labels(self.label_names + ("le",), key + (bound,)),
+                            cumulative))
+            out.append((self.name + "_sum" + _labels(self.label_names, key), series[-1]))
+            out.append((self.name + "_count" + _labels(self.label_names, key), cumulative))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Per-stage latency: decode, stt_first_interim, stt_final, transliteration,
+# synthesis, response_write, speech_client_init, tts_client_init
+stage_latency = registry.register(Histogram(
+    "signify_stage_latency_seconds", "Latency of each request/session stage.", labels=("stage",)))
+
+backend_errors = registry.register(Counter(
+    "signify_backend_errors_total", "Failed Google Speech/TTS calls.", labels=("backend",)))
+
+
+def register_gauge(name, help, fn):
+    """Registers a scrape-time gauge (e.g. active sessions owned by another module)."""
+    return registry.register(Gauge(name, help, fn))
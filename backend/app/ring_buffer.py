@@ -0,0 +1,72 @@
+import threading
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size byte ring for one session's audio. Incoming chunks are copied
+    straight into a preallocated bytearray through a memoryview, and writes that
+    do not fit are dropped (and counted) rather than growing the buffer.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity)
+        self.view = memoryview(self.buffer)
+        self.read_pos = 0
+        self.size = 0
+        self.closed = False
+        self.dropped_frames = 0
+        self.dropped_bytes = 0
+        self.cond = threading.Condition()
+
+    @property
+    def fill(self):
+        """Fraction of the buffer currently holding unread audio."""
+        return self.size / self.capacity
+
+    def write(self, data):
+        """Appends `data` (any bytes-like object). Returns False if it was dropped."""
+        data = memoryview(data).cast("B")
+        n = len(data)
+        with self.cond:
+            if self.closed:
+                return False
+            if n > self.capacity - self.size:
+                self.dropped_frames += 1
+                self.dropped_bytes += n
+                return False
+            start = (self.read_pos + self.size) % self.capacity
+            first = min(n, self.capacity - start)
+            self.view[start:start + first] = data[:first]
+            if first < n:
+                self.view[:n - first] = data[first:]
+            self.size += n
+            self.cond.notify()
+            return True
+
+    def read(self, max_bytes, timeout=None):
+        """
+        Removes and returns up to `max_bytes` of buffered audio, waiting up to
+        `timeout` seconds for some to arrive. Returns None if the buffer is
+        closed and drained, or nothing arrived in time.
+        """
+        with self.cond:
+            if not self.size and not self.closed:
+                self.cond.wait(timeout)
+            if not self.size:
+                return None
+            n = min(max_bytes, self.size)
+            start = self.read_pos
+            first = min(n, self.capacity - start)
+            if first == n:
+                chunk = bytes(self.view[start:start + n])
+            else:
+                chunk = b"".join((self.view[start:], self.view[:n - first]))
+            self.read_pos = (start + n) % self.capacity
+            self.size -= n
+            return chunk
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
@@ -1,35 +1,101 @@
-from flask import request
-from app import app, socketio
-from app.speech_to_text import transcribe_streaming
+from flask import Blueprint, Response, request
+from app import config, socketio
+from app.metrics import register_gauge, registry, stage_latency
+from app.streaming import RecognizerManager
+import atexit
 import base64
+import logging
+import re
+import uuid
 
-@app.route('/')
+log = logging.getLogger(__name__)
+
+# One long-lived streaming recognizer per connected client
+recognizers = RecognizerManager(socketio)
+atexit.register(recognizers.close_all)  # Half-close open streams on shutdown
+
+register_gauge("signify_active_sessions", "Open streaming recognition sessions.",
+               recognizers.active_sessions)
+register_gauge("signify_queued_audio_bytes", "Audio buffered for the recognizers.",
+               recognizers.queued_bytes)
+
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+main = Blueprint('main', __name__)
+
+@main.route('/')
 def home():
     return "Welcome to the Speech-to-Text API"
 
-@app.route('/favicon.ico')
+@main.route('/favicon.ico')
 def favicon():
     return '', 204  # Handle favicon request
 
+@main.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@socketio.on('connect')
+def handle_connect(auth=None):
+    """
+    Clients can opt into tracing with auth={'trace': true} (or pass their own
+    auth={'trace_id': ...}); the ID is then attached to every emitted event.
+    """
+    auth = auth if isinstance(auth, dict) else {}
+    trace_id = auth.get('trace_id')
+    if not (isinstance(trace_id, str) and _TRACE_ID_RE.match(trace_id)):
+        trace_id = uuid.uuid4().hex if auth.get('trace') or config.TRACE_SESSIONS else None
+    if trace_id:
+        recognizers.set_trace_id(request.sid, trace_id)
+        recognizers.emit(request.sid, 'trace', {})
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    recognizers.close(request.sid)
+
+@socketio.on('vad_config')
+def handle_vad_config(data):
+    """Per-session VAD thresholds: energy_threshold, zcr_threshold, hangover_ms, preroll_ms."""
+    if not isinstance(data, dict):
+        recognizers.emit(request.sid, 'error', {'message': 'Invalid VAD config: expected an object'})
+        return
+    allowed = ('energy_threshold', 'zcr_threshold', 'hangover_ms', 'preroll_ms')
+    try:
+        recognizers.configure_vad(request.sid, **{k: data[k] for k in allowed if k in data})
+        recognizers.emit(request.sid, 'vad_stats', recognizers.gate(request.sid).stats())
+    except (TypeError, ValueError) as e:
+        recognizers.emit(request.sid, 'error', {'message': f'Invalid VAD config: {e}'})
+
+def decode_audio_chunk(data):
+    """
+    Returns the raw LINEAR16 bytes carried by an `audio_chunk` event, or None.
+    Accepts a binary attachment (sent as-is, or as {'audio': <bytes>}) and,
+    for older clients, a Base64 string in {'audio': <str>}.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    audio = data.get('audio', None) if isinstance(data, dict) else None
+    if not audio:
+        return None
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return audio
+    # Decode Base64 to raw audio bytes
+    return base64.b64decode(audio)
+
 @socketio.on('audio_chunk')
 def handle_audio_chunk(data):
     try:
-        # Extract and decode the Base64 audio data
-        audio_data_base64 = data.get('audio', None)
-        if not audio_data_base64:
-            socketio.emit('error', {'message': 'No audio data received'})
+        with stage_latency.time(stage='decode'):
+            audio_data = decode_audio_chunk(data)
+        if not audio_data:
+            recognizers.emit(request.sid, 'error', {'message': 'No audio data received'})
             return
 
-        # Decode Base64 to raw audio bytes
-        audio_data = base64.b64decode(audio_data_base64)
-
-        # Transcribe the decoded audio
-        transcript = transcribe_streaming(audio_data)
-
-        # Emit the transcription back to the frontend
-        socketio.emit('transcription', {'text': transcript})
-        print(f"Transcribed text: {transcript}")
+        # Feed the session's recognizer; transcripts are emitted to this client only.
+        # Chunks the recognizer can't keep up with are dropped and answered with `slow_down`.
+        recognizers.feed(request.sid, audio_data)
 
     except Exception as e:
-        print(f"Error processing audio: {e}")
-        socketio.emit('error', {'message': 'Error processing audio'})
+        log.error("Error processing audio (%s): %s", request.sid, e)
+        recognizers.emit(request.sid, 'error', {'message': 'Error processing audio'})
@@ -1,21 +1,30 @@
 from google.cloud import speech
-import io
+from app.clients import get_speech_client
 
-client = speech.SpeechClient()
-
-def transcribe_streaming(audio_stream):
-    """Handles real-time Sinhala speech recognition."""
+def streaming_config():
+    """Builds the Sinhala streaming recognition config (shared by every stream)."""
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
         sample_rate_hertz=16000,
         language_code="si-LK",
     )
-    streaming_config = speech.StreamingRecognitionConfig(config=config, interim_results=True)
+    return speech.StreamingRecognitionConfig(config=config, interim_results=True)
+
+def transcribe_streaming(audio_stream):
+    """
+    Handles real-time Sinhala speech recognition.
+    `audio_stream` is an iterable of raw audio chunks (bytes), one request per chunk.
+    Yields (transcript, is_final) tuples as results arrive.
+    """
+    if isinstance(audio_stream, (bytes, bytearray)):
+        audio_stream = [audio_stream]
 
     requests = (speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in audio_stream)
 
-    response = client.streaming_recognize(streaming_config, requests)
-    
-    for result in response:
-        for alternative in result.results:
-            print("Real-time transcript:", alternative.alternatives[0].transcript)
+    responses = get_speech_client().streaming_recognize(streaming_config(), requests)
+
+    for response in responses:
+        for result in response.results:
+            if not result.alternatives:
+                continue
+            yield result.alternatives[0].transcript, result.is_final
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+from app import config
+
+
+class _Stream:
+    """Results of one recognition stream not yet passed on to the client."""
+
+    def __init__(self):
+        self.finals = []     # Held until every earlier stream has ended
+        self.pending = None  # Latest interim hypothesis not yet sent
+        self.ended = False
+
+
+class TranscriptStabilizer:
+    """
+    Turns the recognizer's stream of full interim hypotheses into small deltas.
+    The client's current text is tracked; each update only sends the part after
+    the prefix it still shares with the new hypothesis:
+
+        transcript_delta  {'offset': n, 'text': tail, 'seq': k, 'stream': s}
+            -> keep the first n characters, replace the rest with `tail`
+        transcription     {'text': full, 'is_final': True, 'seq': k, 'stream': s}
+            -> full resync on every final; the next utterance starts empty
+
+    One stabilizer serves every recognition stream of a Socket.IO session, so
+    `seq` only goes up. Streams can overlap (the next utterance opens while the
+    previous one is still finalizing), so a later stream's results are held
+    until every earlier stream has ended; `stream` is the id from begin().
+
+    Interims are coalesced: at most one delta per `tick` seconds, carrying only
+    the latest hypothesis.
+    """
+
+    def __init__(self, emit, socketio, tick=config.STT_DELTA_TICK):
+        self.emit = emit
+        self.socketio = socketio
+        self.tick = tick
+        self.streams = {}  # stream id -> _Stream, oldest (the one being shown) first
+        self.last_stream = 0
+        self.sent = ""
+        self.seq = 0
+        self.last_flush = 0.0
+        self.flush_scheduled = False
+        self.lock = threading.Lock()
+
+    def begin(self):
+        """Registers a new recognition stream and returns its id."""
+        with self.lock:
+            self.last_stream += 1
+            self.streams[self.last_stream] = _Stream()
+            return self.last_stream
+
+    def interim(self, stream, text):
+        with self.lock:
+            state = self.streams.get(stream)
+            if state is None:
+                return
+            state.pending = text
+            if stream != self._current():
+                return
+            wait = self.last_flush + self.tick - time.monotonic()
+            if wait <= 0:
+                self._flush()
+            elif not self.flush_scheduled:
+                self.flush_scheduled = True
+                self.socketio.start_background_task(self._flush_later, wait)
+
+    def final(self, stream, text):
+        with self.lock:
+            state = self.streams.get(stream)
+            if state is None:
+                return
+            state.pending = None
+            if stream == self._current():
+                self._final(stream, text)
+            else:
+                state.finals.append(text)
+
+    def end(self, stream):
+        """Marks `stream` as finished, sending its last interim and any held results after it."""
+        with self.lock:
+            state = self.streams.get(stream)
+            if state is None:
+                return
+            state.ended = True
+            if stream == self._current():
+                self._advance()
+
+    def _current(self):
+        return next(iter(self.streams), None)
+
+    def _advance(self):
+        # Sends what the current stream still holds; drops it once ended and moves on
+        while self.streams:
+            stream = self._current()
+            state = self.streams[stream]
+            for text in state.finals:
+                self._final(stream, text)
+            state.finals = []
+            self._flush()
+            if not state.ended:
+                return
+            del self.streams[stream]
+            self.sent = ""
+
+    def _flush_later(self, wait):
+        self.socketio.sleep(wait)
+        with self.lock:
+            self.flush_scheduled = False
+            self._flush()
+
+    def _final(self, stream, text):
+        self.seq += 1
+        self.emit('transcription', {'text': text, 'is_final': True, 'seq': self.seq, 'stream': stream})
+        self.sent = ""
+        self.last_flush = time.monotonic()
+
+    def _flush(self):
+        stream = self._current()
+        if stream is None:
+            return
+        state = self.streams[stream]
+        text, state.pending = state.pending, None
+        if text is None or text == self.sent:
+            return
+        offset = len(os.path.commonprefix([self.sent, text]))
+        self.seq += 1
+        self.emit('transcript_delta', {'offset': offset, 'text': text[offset:], 'seq': self.seq,
+                                       'stream': stream})
+        self.sent = text
+        self.last_flush = time.monotonic()
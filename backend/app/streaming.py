@@ -0,0 +1,272 @@
+import functools
+import logging
+import threading
+import time
+
+from app import config
+from app.metrics import backend_errors, stage_latency
+from app.ring_buffer import AudioRingBuffer
+from app.speech_to_text import transcribe_streaming
+from app.stabilizer import TranscriptStabilizer
+from app.vad import UTTERANCE_END, VoiceActivityGate
+
+
+log = logging.getLogger(__name__)
+
+
+class RecognizerSession:
+    """
+    One long-lived streaming recognizer for a single Socket.IO session.
+    Audio is written into a preallocated ring buffer and drained into a single
+    `streaming_recognize` call; results are emitted only to `sid`, through the
+    session's TranscriptStabilizer when given (interims as coalesced deltas,
+    finals as full text).
+    When the client outpaces the recognizer it gets `slow_down` events, and
+    chunks that no longer fit are dropped and counted.
+    """
+
+    def __init__(self, sid, socketio, trace_id=None, on_expired=None, stabilizer=None,
+                 buffer_bytes=config.STREAM_BUFFER_BYTES,
+                 request_bytes=config.STREAM_REQUEST_BYTES,
+                 high_water=config.STREAM_HIGH_WATER,
+                 idle_timeout=config.STREAM_IDLE_TIMEOUT,
+                 max_duration=config.STREAM_MAX_DURATION):
+        self.sid = sid
+        self.socketio = socketio
+        self.trace_id = trace_id
+        self.on_expired = on_expired
+        self.request_bytes = request_bytes
+        self.high_water = high_water
+        self.idle_timeout = idle_timeout
+        self.max_duration = max_duration
+        self.buffer = AudioRingBuffer(buffer_bytes)
+        self.stabilizer = stabilizer
+        self.stream_id = stabilizer.begin() if stabilizer is not None else None
+        self.closed = False
+        self.expired = False  # Hit max_duration; unread audio belongs to the next stream
+        self.started_at = None
+        self.segment_start = None  # First audio of the current utterance (perf_counter)
+        self.last_slow_down = 0.0
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.socketio.start_background_task(self._run)
+
+    def feed(self, chunk):
+        """Buffers a chunk for recognition. Returns False if it was dropped."""
+        if self.closed:
+            return False
+        if self.segment_start is None:
+            self.segment_start = time.perf_counter()
+        accepted = self.buffer.write(chunk)
+        if not accepted or self.buffer.fill >= self.high_water:
+            self._slow_down()
+        return accepted
+
+    def _slow_down(self):
+        now = time.monotonic()
+        if now - self.last_slow_down < config.STREAM_SLOW_DOWN_INTERVAL:
+            return
+        self.last_slow_down = now
+        self._emit('slow_down', {
+            'buffered_bytes': self.buffer.size,
+            'dropped_frames': self.buffer.dropped_frames,
+            'dropped_bytes': self.buffer.dropped_bytes,
+        })
+
+    def _emit(self, event, data):
+        if self.trace_id:
+            data['trace_id'] = self.trace_id
+        self.socketio.emit(event, data, to=self.sid)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.buffer.close()
+
+    def _requests(self):
+        """Yields buffered audio until closed, idle or over the duration limit."""
+        while True:
+            remaining = self.max_duration - (time.monotonic() - self.started_at)
+            if remaining <= 0:
+                # Stop accepting writes but keep what's buffered for the replacement stream
+                self.expired = True
+                break
+            chunk = self.buffer.read(self.request_bytes, timeout=min(self.idle_timeout, remaining))
+            if chunk is None:
+                break
+            yield chunk
+        self.close()
+
+    def _observe_result(self, is_final, first):
+        """Records time to first interim / final, measured from the utterance's first audio."""
+        if self.segment_start is None:
+            return
+        elapsed = time.perf_counter() - self.segment_start
+        if first:
+            stage_latency.observe(elapsed, stage='stt_first_interim')
+        if is_final:
+            stage_latency.observe(elapsed, stage='stt_final')
+            self.segment_start = None
+
+    def _run(self):
+        first = True
+        try:
+            for transcript, is_final in transcribe_streaming(self._requests()):
+                self._observe_result(is_final, first)
+                first = is_final  # The next result starts a new utterance
+                if self.stabilizer is None:
+                    self._emit('transcription', {'text': transcript, 'is_final': is_final})
+                elif is_final:
+                    self.stabilizer.final(self.stream_id, transcript)
+                else:
+                    self.stabilizer.interim(self.stream_id, transcript)
+        except Exception as e:
+            backend_errors.inc(backend='stt')
+            log.error("Streaming recognition error (%s, trace=%s): %s", self.sid, self.trace_id, e)
+            self._emit('error', {'message': 'Error processing audio'})
+        finally:
+            if self.stabilizer is not None:
+                self.stabilizer.end(self.stream_id)
+            self.close()
+            if self.expired and self.buffer.size and self.on_expired is not None:
+                self.on_expired(self.sid)
+
+
+class RecognizerManager:
+    """
+    Keeps at most one open RecognizerSession per Socket.IO session id.
+    With VAD enabled, silent audio never reaches the recognizer, and the end of
+    each utterance half-closes the stream so Google finalizes it right away;
+    the next voiced frame opens a fresh stream. Transcript deltas go through
+    one TranscriptStabilizer per session id, shared by all of its streams.
+    """
+
+    def __init__(self, socketio, vad_enabled=config.VAD_ENABLED,
+                 delta_interims=config.STT_DELTA_INTERIMS, **session_options):
+        self.socketio = socketio
+        self.vad_enabled = vad_enabled
+        self.delta_interims = delta_interims
+        self.session_options = session_options
+        self.sessions = {}
+        self.gates = {}
+        self.stabilizers = {}
+        self.trace_ids = {}
+        self.lock = threading.Lock()
+
+    def set_trace_id(self, sid, trace_id):
+        """Attaches `trace_id` to every event emitted to `sid` from now on."""
+        with self.lock:
+            self.trace_ids[sid] = trace_id
+
+    def emit(self, sid, event, data):
+        trace_id = self.trace_ids.get(sid)
+        if trace_id:
+            data['trace_id'] = trace_id
+        self.socketio.emit(event, data, to=sid)
+
+    def active_sessions(self):
+        with self.lock:
+            return sum(1 for s in self.sessions.values() if not s.closed)
+
+    def queued_bytes(self):
+        with self.lock:
+            return sum(s.buffer.size for s in self.sessions.values())
+
+    def gate(self, sid):
+        """Returns the voice activity gate for `sid`, creating it on first use."""
+        with self.lock:
+            gate = self.gates.get(sid)
+            if gate is None:
+                gate = self.gates[sid] = VoiceActivityGate()
+            return gate
+
+    def _stabilizer(self, sid):
+        # Called with self.lock held
+        if not self.delta_interims:
+            return None
+        stabilizer = self.stabilizers.get(sid)
+        if stabilizer is None:
+            stabilizer = self.stabilizers[sid] = TranscriptStabilizer(
+                functools.partial(self.emit, sid), self.socketio)
+        return stabilizer
+
+    def configure_vad(self, sid, **thresholds):
+        self.gate(sid).configure(**thresholds)
+
+    def get(self, sid):
+        """Returns the live session for `sid`, opening a new stream if needed."""
+        with self.lock:
+            old = self.sessions.get(sid)
+            if old is not None and not old.closed:
+                return old
+            session = RecognizerSession(sid, self.socketio, trace_id=self.trace_ids.get(sid),
+                                        on_expired=self._reopen, stabilizer=self._stabilizer(sid),
+                                        **self.session_options)
+            if old is not None and old.expired:
+                # Audio the expired stream never sent goes first in the new one
+                leftover = old.buffer.read(old.buffer.capacity, timeout=0)
+                if leftover:
+                    session.feed(leftover)
+            self.sessions[sid] = session
+            session.start()
+            return session
+
+    def _reopen(self, sid):
+        """Replaces an expired stream that still holds audio, unless `sid` has disconnected."""
+        with self.lock:
+            connected = sid in self.sessions
+        if connected:
+            self.get(sid)
+
+    def feed(self, sid, chunk):
+        if not self.vad_enabled:
+            return self._feed(sid, chunk)
+
+        gate = self.gate(sid)
+        accepted = True
+        # Audio after an utterance boundary goes to the next stream, not the one being closed
+        for piece in gate.process(chunk):
+            if piece is UTTERANCE_END:
+                self.end_utterance(sid, gate.stats())
+            elif not self._feed(sid, piece):
+                accepted = False
+        return accepted
+
+    def end_utterance(self, sid, vad_stats):
+        """Half-closes the current stream so its transcript is finalized now."""
+        with self.lock:
+            session = self.sessions.get(sid)
+        if session is not None:
+            session.close()
+        self.emit(sid, 'utterance_end', vad_stats)
+
+    def _feed(self, sid, chunk):
+        session = self.get(sid)
+        if session.feed(chunk):
+            return True
+        if session.closed:
+            # The stream hit its idle/duration limit in between; reopen once.
+            return self.get(sid).feed(chunk)
+        return False
+
+    def close(self, sid):
+        with self.lock:
+            session = self.sessions.pop(sid, None)
+            gate = self.gates.pop(sid, None)
+            self.stabilizers.pop(sid, None)
+            trace_id = self.trace_ids.pop(sid, None)
+        if session is not None:
+            session.close()
+        if gate is not None:
+            log.info("VAD stats (%s, trace=%s): %s", sid, trace_id, gate.stats())
+
+    def close_all(self):
+        with self.lock:
+            sessions, self.sessions = list(self.sessions.values()), {}
+            self.gates = {}
+            self.stabilizers = {}
+            self.trace_ids = {}
+        for session in sessions:
+            session.close()
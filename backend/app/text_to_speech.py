@@ -1,132 +1,136 @@
-from flask import Flask, request, Response, jsonify
-from flask_cors import CORS
-import os
-import unicodedata
+from flask import Blueprint, request, Response, jsonify
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import texttospeech
+from app import config
+from app.clients import get_tts_client
+from app.metrics import backend_errors, stage_latency
+from app.transliteration import transliterate_sinhala
+from app.tts_cache import TTSCache, cache_key
 
-# Set the Google Cloud credentials.
-# Alternatively, set the environment variable GOOGLE_APPLICATION_CREDENTIALS before running the app.
-os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "deaf-app-449508-4fb87c855e35.json"
+log = logging.getLogger(__name__)
 
-app = Flask(__name__)
-CORS(app)  # Allow CORS for all domains on all routes
+tts = Blueprint('tts', __name__)
 
 # -----------------------------
-# Sinhala Transliteration Setup
+# Synthesized Speech Cache
 # -----------------------------
 
-# Mappings for independent vowels
-independentVowels = {
-    "අ": "a", "ආ": "aa", "ඇ": "ae", "ඈ": "aae",
-    "ඉ": "i", "ඊ": "ii", "උ": "u", "ඌ": "uu",
-    "ඍ": "ri", "ඎ": "rii", "එ": "e", "ඒ": "ee",
-    "ඓ": "ai", "ඔ": "o", "ඕ": "oo", "ඖ": "au"
-}
-
-# Mappings for consonants without inherent vowels
-consonants = {
-    "ක": "k", "ග": "g", "ච": "ch", "ජ": "j",
-    "ට": "t", "ඩ": "d", "ණ": "n", "ත": "th",
-    "ද": "d", "න": "n", "ප": "p", "බ": "b",
-    "ම": "m", "ය": "y", "ර": "r", "ල": "l",
-    "ව": "v", "ස": "s", "හ": "h", "ළ": "l",
-    "ෆ": "f"
-}
-
-# Mappings for vowel diacritics that modify a consonant
-vowelDiacritics = {
-    "ා": "aa", "ැ": "ae", "ෑ": "aae",
-    "ි": "i", "ී": "ii", "ු": "u",
-    "ූ": "uu", "ෙ": "e", "ේ": "ee",
-    "ෛ": "ai", "ො": "o", "ෝ": "oo",
-    "ෞ": "au"
-}
-
-# Diacritics that require an extra "a" before the mapped vowel
-diacriticsThatRequireA = {"ෙ", "ේ"}
-
-# The hal kirīma character, which suppresses the inherent vowel
-halKirima = "්"
-
-def transliterate_sinhala(text):
-    """
-    Convert Sinhala text to a Malay-phonetic transliteration.
-    """
-    # Normalize text (similar to JS .normalize('NFC'))
-    text = unicodedata.normalize('NFC', text)
-    result = ""
-    i = 0
-
-    while i < len(text):
-        ch = text[i]
-
-        # If the character is an independent vowel, append its mapping.
-        if ch in independentVowels:
-            result += independentVowels[ch]
-            i += 1
-            continue
-
-        # If the character is a consonant:
-        if ch in consonants:
-            # Check if a hal kirīma follows to indicate a consonant cluster.
-            if i + 1 < len(text) and text[i + 1] == halKirima:
-                cluster = []
-                # Collect all consonants in the cluster.
-                while i < len(text) and text[i] in consonants and (i + 1 < len(text) and text[i + 1] == halKirima):
-                    cluster.append(consonants[text[i]])
-                    i += 2  # Skip the consonant and the hal kirīma.
-                # Process the base consonant of the cluster.
-                if i < len(text) and text[i] in consonants:
-                    base = consonants[text[i]]
-                    i += 1
-                    # If a vowel diacritic follows, process it.
-                    if i < len(text) and text[i] in vowelDiacritics:
-                        d = text[i]
-                        base += ("a" + vowelDiacritics[d]) if d in diacriticsThatRequireA else vowelDiacritics[d]
-                        i += 1
-                    else:
-                        base += "a"  # Append inherent vowel.
-                    result += "".join(cluster) + base
-                else:
-                    result += "".join(cluster)
-            else:
-                base = consonants[ch]
-                i += 1
-                if i < len(text) and text[i] in vowelDiacritics:
-                    d = text[i]
-                    base += ("a" + vowelDiacritics[d]) if d in diacriticsThatRequireA else vowelDiacritics[d]
-                    i += 1
-                else:
-                    base += "a"  # Append inherent vowel.
-                result += base
-            continue
+VOICE_LANGUAGE_CODE = 'ms-MY'
+VOICE_NAME = 'ms-MY-Standard-A'
+SPEAKING_RATE = 0.9
+AUDIO_ENCODING = texttospeech.AudioEncoding.MP3
+
+tts_cache = TTSCache(
+    memory_bytes=config.TTS_CACHE_MEMORY_BYTES,
+    disk_dir=config.TTS_CACHE_DIR,
+    disk_bytes=config.TTS_CACHE_DISK_BYTES,
+)
+
+def synthesize_mp3(phonetic_text):
+    """Synthesizes `phonetic_text` with the Malay voice and returns the MP3 bytes."""
+    # Shared Google Cloud TTS client
+    client = get_tts_client()
+
+    synthesis_input = texttospeech.SynthesisInput(text=phonetic_text)
+    voice = texttospeech.VoiceSelectionParams(
+        language_code=VOICE_LANGUAGE_CODE,
+        name=VOICE_NAME
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=AUDIO_ENCODING,
+        speaking_rate=SPEAKING_RATE
+    )
+
+    # Perform the text-to-speech request
+    try:
+        with stage_latency.time(stage='synthesis'):
+            response = client.synthesize_speech(
+                input=synthesis_input,
+                voice=voice,
+                audio_config=audio_config
+            )
+    except Exception:
+        backend_errors.inc(backend='tts')
+        raise
+    return response.audio_content
+
+def cached_synthesize_mp3(phonetic_text):
+    """Returns MP3 bytes for `phonetic_text`, synthesizing only on a cache miss."""
+    key = cache_key(phonetic_text, VOICE_NAME, VOICE_LANGUAGE_CODE, SPEAKING_RATE, AUDIO_ENCODING)
+    return tts_cache.get_or_synthesize(key, lambda: synthesize_mp3(phonetic_text))
 
-        # If the character is a vowel diacritic, append its mapping.
-        if ch in vowelDiacritics:
-            result += vowelDiacritics[ch]
-            i += 1
-            continue
+# -----------------------------
+# Segmented Streaming Synthesis
+# -----------------------------
 
-        # Skip the hal kirīma if it appears alone.
-        if ch == halKirima:
-            i += 1
-            continue
+# Split after sentence/clause punctuation (and on line breaks)
+_SEGMENT_BOUNDARY_RE = re.compile(r"(?<=[.!?;:,\u0DF4])\s+|\n+")
 
-        # For any other character, just append it as-is.
-        result += ch
-        i += 1
+# First segments get their own pool so a long request's later segments can
+# never delay another request's time-to-first-audio.
+first_segment_pool = ThreadPoolExecutor(max_workers=config.TTS_STREAM_FIRST_WORKERS,
+                                        thread_name_prefix="tts-first-segment")
+synthesis_pool = ThreadPoolExecutor(max_workers=config.TTS_STREAM_WORKERS,
+                                    thread_name_prefix="tts-segment")
 
-    return result
+def split_segments(text, min_chars=config.TTS_STREAM_MIN_SEGMENT_CHARS):
+    """
+    Splits text on sentence and clause boundaries, merging fragments shorter
+    than `min_chars` into the following segment so prosody stays natural.
+    """
+    segments = []
+    pending = ""
+    for part in _SEGMENT_BOUNDARY_RE.split(text):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_chars:
+            segments.append(pending)
+            pending = ""
+    if pending:
+        if segments and len(pending) < min_chars:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+def stream_segments(segments, window=config.TTS_STREAM_WINDOW):
+    """
+    Synthesizes segments concurrently and yields their MP3 bytes in order.
+    The first segment runs on `first_segment_pool`, the rest on the shared
+    `synthesis_pool`, with at most `window` segments of this request in flight.
+    """
+    futures = []
+    next_index = 0
+    try:
+        for i in range(len(segments)):
+            while next_index < len(segments) and next_index < i + window:
+                pool = first_segment_pool if next_index == 0 else synthesis_pool
+                futures.append(pool.submit(cached_synthesize_mp3, segments[next_index]))
+                next_index += 1
+            yield futures[i].result()
+            futures[i] = None  # Release audio already sent
+    finally:
+        # Client went away or a segment failed: drop work that hasn't started.
+        for future in futures:
+            if future is not None:
+                future.cancel()
 
 # -----------------------------
 # Flask Endpoint for TTS
 # -----------------------------
 
-@app.route('/speak', methods=['POST'])
+@tts.route('/speak', methods=['POST'])
 def speak():
     """
     Expects a JSON payload with a "text" field.
     Transliterates the text and returns the synthesized speech (MP3).
+    With `?stream=1`, the text is synthesized per sentence/clause and the
+    MP3 frames are streamed back in order as each segment finishes.
     """
     data = request.get_json()
     if not data or 'text' not in data:
@@ -134,39 +138,56 @@ def speak():
 
     text = data['text']
     # Convert Sinhala text to Malay phonetics
-    phonetic_text = transliterate_sinhala(text)
-    print("Converted Phonetic Text:", phonetic_text)
+    with stage_latency.time(stage='transliteration'):
+        phonetic_text = transliterate_sinhala(text)
+    log.debug("Converted Phonetic Text: %s", phonetic_text)
+
+    if request.args.get('stream') in ('1', 'true'):
+        return speak_streaming(phonetic_text)
 
     try:
-        # Initialize the Google Cloud TTS client
-        client = texttospeech.TextToSpeechClient()
-
-        synthesis_input = texttospeech.SynthesisInput(text=phonetic_text)
-        voice = texttospeech.VoiceSelectionParams(
-            language_code='ms-MY',
-            name='ms-MY-Standard-A'
-        )
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.MP3,
-            speaking_rate=0.9
-        )
-
-        # Perform the text-to-speech request
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
+        audio_content = cached_synthesize_mp3(phonetic_text)
 
         # Return the MP3 audio with the appropriate header
-        return Response(response.audio_content, mimetype='audio/mpeg')
+        return audio_response(audio_content)
     except Exception as e:
-        print("TTS Error:", e)
+        log.error("TTS Error: %s", e)
         return jsonify({'error': 'Failed to generate speech.'}), 500
 
-# -----------------------------
-# Run the Flask App
-# -----------------------------
+def speak_streaming(phonetic_text):
+    segments = split_segments(phonetic_text) or [phonetic_text]
+    audio_segments = stream_segments(segments)
+    try:
+        # Resolve the first segment up front so a backend failure still gets a 500
+        first = next(audio_segments)
+    except Exception as e:
+        log.error("TTS Error: %s", e)
+        return jsonify({'error': 'Failed to generate speech.'}), 500
+
+    def generate():
+        yield first
+        try:
+            yield from audio_segments
+        except Exception as e:
+            # Headers are already sent; end the stream early.
+            log.error("TTS Streaming Error: %s", e)
+        finally:
+            audio_segments.close()
 
-if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    return audio_response(generate())
+
+def audio_response(body):
+    """
+    MP3 response that records how long the body took to write out
+    (for streamed responses this includes waiting on later segments).
+    """
+    response = Response(body, mimetype='audio/mpeg')
+    start = time.perf_counter()
+    response.call_on_close(
+        lambda: stage_latency.observe(time.perf_counter() - start, stage='response_write'))
+    return response
+
+@tts.route('/speak/cache', methods=['GET'])
+def speak_cache_stats():
+    """Hit/miss/eviction counters for the synthesized speech cache."""
+    return jsonify(tts_cache.snapshot())
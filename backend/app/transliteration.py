@@ -0,0 +1,125 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# -----------------------------
+# Sinhala Transliteration Setup
+# -----------------------------
+
+# Mappings for independent vowels
+independentVowels = {
+    "අ": "a", "ආ": "aa", "ඇ": "ae", "ඈ": "aae",
+    "ඉ": "i", "ඊ": "ii", "උ": "u", "ඌ": "uu",
+    "ඍ": "ri", "ඎ": "rii", "එ": "e", "ඒ": "ee",
+    "ඓ": "ai", "ඔ": "o", "ඕ": "oo", "ඖ": "au"
+}
+
+# Mappings for consonants without inherent vowels
+consonants = {
+    "ක": "k", "ග": "g", "ච": "ch", "ජ": "j",
+    "ට": "t", "ඩ": "d", "ණ": "n", "ත": "th",
+    "ද": "d", "න": "n", "ප": "p", "බ": "b",
+    "ම": "m", "ය": "y", "ර": "r", "ල": "l",
+    "ව": "v", "ස": "s", "හ": "h", "ළ": "l",
+    "ෆ": "f"
+}
+
+# Mappings for vowel diacritics that modify a consonant
+vowelDiacritics = {
+    "ා": "aa", "ැ": "ae", "ෑ": "aae",
+    "ි": "i", "ී": "ii", "ු": "u",
+    "ූ": "uu", "ෙ": "e", "ේ": "ee",
+    "ෛ": "ai", "ො": "o", "ෝ": "oo",
+    "ෞ": "au"
+}
+
+# Diacritics that require an extra "a" before the mapped vowel
+diacriticsThatRequireA = {"ෙ", "ේ"}
+
+# The hal kirīma character, which suppresses the inherent vowel
+halKirima = "්"
+
+# -----------------------------
+# Compiled Transliteration Engine
+# -----------------------------
+
+def _char_class(chars):
+    return "[" + "".join(re.escape(c) for c in chars) + "]"
+
+_C = _char_class(consonants)
+_D = _char_class(vowelDiacritics)
+_V = _char_class(independentVowels)
+_H = re.escape(halKirima)
+
+# One alternation over the whole grammar. Order matters: a consonant cluster
+# (C + hal kirīma, repeated, then an optional base consonant and diacritic) is
+# tried before a lone consonant, so the longest syllable always wins.
+_SYLLABLE_RE = re.compile(
+    f"(?:{_C}{_H})+(?:{_C}{_D}?)?"
+    f"|{_C}{_D}?"
+    f"|{_V}|{_D}|{_H}"
+)
+
+# Words never span whitespace, so each one can be memoized independently.
+_WORD_RE = re.compile(r"\S+")
+
+def _vowel_sign(d):
+    return ("a" + vowelDiacritics[d]) if d in diacriticsThatRequireA else vowelDiacritics[d]
+
+def _render(syllable):
+    """Transliterates one `_SYLLABLE_RE` match (used to fill the lookup table)."""
+    ch = syllable[0]
+    if ch in independentVowels:
+        return independentVowels[ch]
+    if ch in vowelDiacritics:
+        return vowelDiacritics[ch]
+    if ch == halKirima:
+        return ""
+    # Consonant cluster and/or base consonant: every "C්" pair contributes
+    # only the consonant, and a trailing base takes its diacritic or "a".
+    out = []
+    i, n = 0, len(syllable)
+    while i < n and i + 1 < n and syllable[i + 1] == halKirima:
+        out.append(consonants[syllable[i]])
+        i += 2
+    if i < n:
+        out.append(consonants[syllable[i]])
+        out.append(_vowel_sign(syllable[i + 1]) if i + 1 < n else "a")
+    return "".join(out)
+
+# Every single-syllable form is finite (vowels, diacritics, hal kirīma,
+# consonant +/- diacritic), so those are precomputed. Consonant clusters come
+# from user input and are unbounded, so they go through a bounded cache.
+_table = {}
+for _s in list(independentVowels) + list(vowelDiacritics) + [halKirima]:
+    _table[_s] = _render(_s)
+for _c in consonants:
+    _table[_c] = _render(_c)
+    for _d in vowelDiacritics:
+        _table[_c + _d] = _render(_c + _d)
+
+_render_cluster = lru_cache(maxsize=4096)(_render)
+
+def _lookup(match):
+    syllable = match.group()
+    value = _table.get(syllable)
+    return _render_cluster(syllable) if value is None else value
+
+@lru_cache(maxsize=8192)
+def _transliterate_word(word):
+    return _SYLLABLE_RE.sub(_lookup, word)
+
+def _word(match):
+    return _transliterate_word(match.group())
+
+def transliterate_sinhala(text):
+    """
+    Convert Sinhala text to a Malay-phonetic transliteration.
+    """
+    # Normalize text (similar to JS .normalize('NFC'))
+    text = unicodedata.normalize('NFC', text)
+    return _WORD_RE.sub(_word, text)
+
+def transliterate_many(texts):
+    """Transliterates each string in `texts`, sharing the word cache across the batch."""
+    return [transliterate_sinhala(text) for text in texts]
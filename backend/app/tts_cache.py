@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+def cache_key(text, voice_name, language_code, speaking_rate, encoding):
+    """Content address for a synthesized clip: every input that changes the audio."""
+    parts = [text, voice_name, language_code, repr(float(speaking_rate)), str(encoding)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class MemoryLRU:
+    """In-memory LRU of audio bytes bounded by total size rather than entry count."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        audio = self.entries.get(key)
+        if audio is not None:
+            self.entries.move_to_end(key)
+        return audio
+
+    def put(self, key, audio):
+        """Stores `audio` and returns the number of entries evicted to make room."""
+        if len(audio) > self.max_bytes:
+            return 0
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.entries[key] = audio
+        self.size += len(audio)
+        evicted = 0
+        while self.size > self.max_bytes:
+            _, dropped = self.entries.popitem(last=False)
+            self.size -= len(dropped)
+            evicted += 1
+        return evicted
+
+
+class DiskStore:
+    """
+    On-disk MP3 store keyed by content hash, evicting least recently used files by size.
+    Recency and sizes are tracked in memory (seeded from file mtimes at startup),
+    so a put never rescans the directory; eviction goes down to `low_water` of
+    `max_bytes` so a full store doesn't evict on every put.
+    """
+
+    def __init__(self, directory, max_bytes, low_water=0.9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.target_bytes = int(max_bytes * low_water)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.index = OrderedDict()  # key -> size, least recently used first
+        files = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self.index[key] = size
+        self.size = sum(self.index.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".mp3")
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.index:
+                return None
+            self.index.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            # Evicted since the index lookup, or removed from outside
+            return None
+        try:
+            os.utime(path)  # Keeps recency across restarts
+        except FileNotFoundError:
+            pass
+        return audio
+
+    def put(self, key, audio):
+        """Atomically writes `audio` and returns the number of files evicted."""
+        if len(audio) > self.max_bytes:
+            return 0
+        with self.lock:
+            if key in self.index:
+                return 0
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+        except OSError:
+            os.remove(tmp)
+            raise
+        with self.lock:
+            os.replace(tmp, path)
+            self.size += len(audio) - self.index.pop(key, 0)
+            self.index[key] = len(audio)
+            return self._evict() if self.size > self.max_bytes else 0
+
+    def _evict(self):
+        evicted = 0
+        while self.size > self.target_bytes and self.index:
+            key, size = self.index.popitem(last=False)
+            self.size -= size
+            evicted += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+        return evicted
+
+
+class TTSCache:
+    """
+    Two-tier cache for synthesized speech (memory LRU in front of a disk store).
+    Concurrent misses for the same key share a single synthesis call. New clips
+    are written to disk by a background thread after the callers have their audio.
+    """
+
+    def __init__(self, memory_bytes, disk_dir=None, disk_bytes=0):
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = None
+        if disk_dir and disk_bytes:
+            try:
+                self.disk = DiskStore(disk_dir, disk_bytes)
+            except OSError as e:
+                # An unusable cache directory must not stop the app from starting
+                log.warning("TTS disk cache disabled, serving from memory only: %s", e)
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-disk") if self.disk else None
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "shared_inflight": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0,
+        }
+
+    def get_or_synthesize(self, key, synthesize):
+        """Returns cached audio for `key`, calling `synthesize()` at most once per key at a time."""
+        with self.lock:
+            audio = self.memory.get(key)
+            if audio is not None:
+                self.stats["memory_hits"] += 1
+                return audio
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.inflight[key] = _Flight()
+            else:
+                self.stats["shared_inflight"] += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            audio = self._disk_get(key)
+            synthesized = audio is None
+            if synthesized:
+                self._count("misses")
+                audio = synthesize()
+            else:
+                self._count("disk_hits")
+            with self.lock:
+                self.stats["memory_evictions"] += self.memory.put(key, audio)
+            flight.set_result(audio)
+        except Exception as e:
+            flight.set_error(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+        if synthesized:
+            self._disk_put(key, audio)
+        return audio
+
+    def _disk_get(self, key):
+        """Disk lookup; an unreadable disk tier counts as a miss instead of failing the request."""
+        if not self.disk:
+            return None
+        try:
+            return self.disk.get(key)
+        except OSError as e:
+            self._count("disk_errors")
+            log.warning("TTS disk cache read failed: %s", e)
+            return None
+
+    def _disk_put(self, key, audio):
+        """Queues synthesized audio for the disk tier without holding up the request."""
+        if self.disk:
+            self.writer.submit(self._disk_write, key, audio)
+
+    def _disk_write(self, key, audio):
+        # A failure (e.g. a full disk) only skips this tier
+        try:
+            self._count("disk_evictions", self.disk.put(key, audio))
+        except OSError as e:
+            self._count("disk_errors")
+            log.warning("TTS disk cache write failed: %s", e)
+
+    def flush(self):
+        """Waits until queued disk writes have finished."""
+        if self.writer:
+            self.writer.submit(lambda: None).result()
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def snapshot(self):
+        """Current counters and tier sizes, for sizing the cache."""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["memory_bytes"] = self.memory.size
+            stats["memory_entries"] = len(self.memory.entries)
+        stats["disk_bytes"] = self.disk.size if self.disk else 0
+        return stats
+
+
+class _Flight:
+    """Result slot shared by requests waiting on the same in-flight synthesis."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.audio = None
+        self.error = None
+
+    def set_result(self, audio):
+        self.audio = audio
+        self.done.set()
+
+    def set_error(self, error):
+        self.error = error
+        self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.audio
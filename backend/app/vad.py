@@ -0,0 +1,155 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from app import config
+
+# Marker in VoiceActivityGate.process() output where an utterance ended
+UTTERANCE_END = object()
+
+
+class VoiceActivityGate:
+    """
+    Energy + zero-crossing voice activity detector for 16 kHz LINEAR16 audio.
+    Frame features are computed with NumPy for a whole chunk at once; a small
+    per-frame state machine then applies hangover (keep sending briefly after
+    speech stops) and pre-roll (replay the frames just before speech starts).
+    """
+
+    def __init__(self,
+                 sample_rate=16000,
+                 frame_ms=config.VAD_FRAME_MS,
+                 energy_threshold=config.VAD_ENERGY_THRESHOLD,
+                 zcr_threshold=config.VAD_ZCR_THRESHOLD,
+                 hangover_ms=config.VAD_HANGOVER_MS,
+                 preroll_ms=config.VAD_PREROLL_MS):
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.energy_threshold = energy_threshold
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = hangover_ms // frame_ms
+        self.preroll = deque(maxlen=preroll_ms // frame_ms)
+        self.remainder = b""
+        self.hangover = 0
+        self.in_speech = False
+        self.frames_total = 0
+        self.frames_sent = 0
+
+    def configure(self, energy_threshold=None, zcr_threshold=None,
+                  hangover_ms=None, preroll_ms=None):
+        """
+        Updates thresholds for this session; omitted values are kept. Every
+        value is checked before any is applied, so a ValueError leaves the
+        gate unchanged.
+        """
+        values = {}
+        for name, value in (("energy_threshold", energy_threshold), ("zcr_threshold", zcr_threshold),
+                            ("hangover_ms", hangover_ms), ("preroll_ms", preroll_ms)):
+            if value is None:
+                continue
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number, got {value!r}") from None
+            if not (math.isfinite(number) and number >= 0):
+                raise ValueError(f"{name} must be a non-negative number, got {value!r}")
+            values[name] = number
+
+        frame_ms = self.frame_samples * 1000 // self.sample_rate
+        if "energy_threshold" in values:
+            self.energy_threshold = values["energy_threshold"]
+        if "zcr_threshold" in values:
+            self.zcr_threshold = values["zcr_threshold"]
+        if "hangover_ms" in values:
+            self.hangover_frames = int(values["hangover_ms"]) // frame_ms
+        if "preroll_ms" in values:
+            self.preroll = deque(self.preroll, maxlen=int(values["preroll_ms"]) // frame_ms)
+
+    def speech_frames(self, frames):
+        """Boolean mask of frames that look like speech (frames: n x frame_samples int16)."""
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_samples - 1)
+        # Loud frames are voiced speech; quieter but noisy frames are unvoiced
+        # consonants (s, sh, f) that would otherwise be clipped.
+        return (rms >= self.energy_threshold) | (
+            (rms >= self.energy_threshold / 2) & (zcr >= self.zcr_threshold))
+
+    def process(self, chunk):
+        """
+        Feeds one chunk of audio. Returns, in order, the pieces that should
+        reach the recognizer and an UTTERANCE_END marker wherever an utterance
+        ended (hangover ran out). Voiced audio is returned as memoryview slices
+        of `chunk` covering contiguous runs of frames; only the pre-roll (and a
+        frame straddling two chunks) is copied.
+        """
+        view = memoryview(chunk).cast("B")
+        out = []
+        if self.remainder:
+            # Complete the frame left over from the previous chunk
+            need = self.frame_bytes - len(self.remainder)
+            head = self.remainder + bytes(view[:need])
+            view = view[need:]
+            if len(head) < self.frame_bytes:
+                self.remainder = head
+                return out
+            self.remainder = b""
+            self._gate(memoryview(head), out)
+
+        usable = len(view) - len(view) % self.frame_bytes
+        if usable < len(view):
+            self.remainder = bytes(view[usable:])
+        if usable:
+            self._gate(view[:usable], out)
+        return out
+
+    def _gate(self, view, out):
+        """Runs the VAD over `view` (whole frames), appending pieces/markers to `out`."""
+        n_frames = len(view) // self.frame_bytes
+        fb = self.frame_bytes
+        frames = np.frombuffer(view, dtype="<i2").reshape(n_frames, self.frame_samples)
+        is_speech = self.speech_frames(frames)
+
+        span_start = None  # First frame of the current run being sent
+        for i, speech in enumerate(is_speech.tolist()):
+            send = speech or (self.in_speech and self.hangover > 0)
+            if speech:
+                if not self.in_speech:
+                    if self.preroll:
+                        out.append(b"".join(self.preroll))
+                        self.frames_sent += len(self.preroll)
+                        self.preroll.clear()
+                    self.in_speech = True
+                self.hangover = self.hangover_frames
+            elif send:
+                self.hangover -= 1
+
+            if send:
+                if span_start is None:
+                    span_start = i
+                continue
+            if span_start is not None:
+                out.append(view[span_start * fb:i * fb])
+                self.frames_sent += i - span_start
+                span_start = None
+            if self.in_speech:
+                self.in_speech = False
+                out.append(UTTERANCE_END)
+            self.preroll.append(bytes(view[i * fb:(i + 1) * fb]))
+
+        if span_start is not None:
+            out.append(view[span_start * fb:])
+            self.frames_sent += n_frames - span_start
+        self.frames_total += n_frames
+
+    def stats(self):
+        """How much audio the gate has kept away from the recognizer so far."""
+        suppressed = self.frames_total - self.frames_sent
+        return {
+            'frames_total': self.frames_total,
+            'frames_suppressed': suppressed,
+            'seconds_suppressed': round(suppressed * self.frame_samples / self.sample_rate, 3),
+        }
@@ -0,0 +1,77 @@
+"""
+Local stand-ins for the Google Speech and Text-to-Speech clients, so the
+backend can be load tested offline. Latency, interim-result cadence and
+failure rate are configurable.
+"""
+import random
+import time
+from types import SimpleNamespace
+
+
+class FakeBackendError(Exception):
+    """Raised by the fakes to simulate a failed Google call."""
+
+
+def _response(transcript, is_final):
+    alternative = SimpleNamespace(transcript=transcript)
+    result = SimpleNamespace(alternatives=[alternative], is_final=is_final)
+    return SimpleNamespace(results=[result])
+
+
+class FakeSpeechClient:
+    """
+    Mimics `speech.SpeechClient.streaming_recognize`: consumes the request
+    iterator and yields an interim result every `interim_every` requests
+    (after `interim_latency` seconds) and a final result when the stream ends.
+    """
+
+    def __init__(self, interim_every=3, interim_latency=0.05, final_latency=0.15,
+                 failure_rate=0.0, seed=None):
+        self.interim_every = interim_every
+        self.interim_latency = interim_latency
+        self.final_latency = final_latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.streams = 0
+
+    def streaming_recognize(self, config, requests, **kwargs):
+        self.streams += 1
+        if self.rng.random() < self.failure_rate:
+            raise FakeBackendError("simulated streaming_recognize failure")
+        return self._responses(requests)
+
+    def _responses(self, requests):
+        words = []
+        for count, request in enumerate(requests, 1):
+            if not request.audio_content:
+                continue
+            if count % self.interim_every == 0:
+                words.append(f"w{len(words)}")
+                time.sleep(self.interim_latency)
+                yield _response(" ".join(words), False)
+        time.sleep(self.final_latency)
+        yield _response(" ".join(words) or "w0", True)
+
+
+class FakeTextToSpeechClient:
+    """
+    Mimics `texttospeech.TextToSpeechClient.synthesize_speech`: sleeps for a
+    base latency plus a per-character cost and returns MP3-sized filler bytes.
+    """
+
+    def __init__(self, latency=0.15, latency_per_char=0.001, bytes_per_char=400,
+                 failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.bytes_per_char = bytes_per_char
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def synthesize_speech(self, input, voice, audio_config, **kwargs):
+        self.calls += 1
+        text = input.text
+        time.sleep(self.latency + self.latency_per_char * len(text))
+        if self.rng.random() < self.failure_rate:
+            raise FakeBackendError("simulated synthesize_speech failure")
+        return SimpleNamespace(audio_content=b"\xff\xfb" * (self.bytes_per_char * max(len(text), 1) // 2))
@@ -0,0 +1,334 @@
+"""
+Offline load test for the backend. The app runs in its own process
+(benchmarks.server) with Google Speech and TTS replaced by the local fakes in
+benchmarks.fakes, while many simulated clients stream `audio_chunk` events
+over a WebSocket and others call /speak concurrently.
+
+Reports throughput, p50/p95/p99 time-to-first-transcript (TTFT), time-to-final
+and time-to-audio (first MP3 byte), plus the server process's CPU time and
+peak memory. Results
+can be saved as JSON and compared against a previous run:
+
+    python -m benchmarks.load_test --sessions 50 --speak 200 --output base.json
+    python -m benchmarks.load_test --sessions 50 --speak 200 --compare base.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+import socketio as socketio_client
+
+from app import config
+
+SAMPLE_RATE = 16000
+
+SPEAK_TEXTS = [
+    "ආයුබෝවන්",
+    "මට උදව් කරන්න.",
+    "පටිගත කිරීම ආරම්භ කිරීමට මයික්‍රෆෝනය තට්ටු කරන්න.",
+    "ශ්‍රී ලංකාව ඉන්දියන් සාගරයේ පිහිටි දිවයිනකි. අපි හෙට උදේ පාසලට යන්නෙමු, ඔබත් එන්න.",
+]
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def percentile(values, pct):
+    if not values:
+        return None
+    return float(np.percentile(values, pct))
+
+def summarize(values):
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+    }
+
+def utterance_audio(seconds, chunk_ms):
+    """A voiced tone followed by enough silence for the VAD to end the utterance."""
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    tone = (3000 * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+    silence = np.zeros(int(SAMPLE_RATE * (config.VAD_HANGOVER_MS / 1000 + 0.2)), dtype="<i2")
+    audio = np.concatenate([tone, silence]).tobytes()
+    step = SAMPLE_RATE * 2 * chunk_ms // 1000
+    return [audio[i:i + step] for i in range(0, len(audio), step)]
+
+def serve(args):
+    """Starts benchmarks.server in a subprocess and returns (process, url) once it answers."""
+    command = [sys.executable, '-m', 'benchmarks.server', '--port', str(args.port)]
+    for name in SERVER_PARAMS:
+        command += ['--' + name.replace('_', '-'), str(getattr(args, name))]
+    process = subprocess.Popen(command, env={**os.environ, 'LOG_LEVEL': 'WARNING'})
+    url = f"http://127.0.0.1:{args.port}"
+    for _ in range(200):
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            requests.get(url, timeout=1)
+            return process, url
+        except requests.ConnectionError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+def server_usage(url):
+    return requests.get(f"{url}/_bench/usage", timeout=5).json()
+
+# -----------------------------
+# Simulated Clients
+# -----------------------------
+
+def run_recording_session(url, chunks, chunk_ms, realtime, timeout):
+    """Streams one utterance and returns (ttft, time_to_final) in seconds, or None on failure."""
+    client = socketio_client.Client(reconnection=False)
+    first = threading.Event()
+    final = threading.Event()
+    marks = {}
+
+    @client.on('transcription')
+    def on_transcription(data):
+        now = time.perf_counter()
+        marks.setdefault('first', now)
+        first.set()
+        if data.get('is_final'):
+            marks.setdefault('final', now)
+            final.set()
+
+    @client.on('transcript_delta')
+    def on_delta(data):
+        marks.setdefault('first', time.perf_counter())
+        first.set()
+
+    @client.on('error')
+    def on_error(data):
+        marks['error'] = data
+        final.set()
+
+    try:
+        client.connect(url, transports=['websocket'], wait_timeout=timeout)
+        start = time.perf_counter()
+        for chunk in chunks:
+            client.emit('audio_chunk', chunk)
+            if realtime:
+                time.sleep(chunk_ms / 1000)
+        final.wait(timeout)
+    except Exception as e:
+        marks['error'] = str(e)
+    finally:
+        # websocket-client waits up to 3s for a close frame the Werkzeug dev
+        # server never sends; that wait isn't part of the session
+        threading.Thread(target=client.disconnect, daemon=True).start()
+
+    if 'error' in marks or 'final' not in marks:
+        return None
+    return marks['first'] - start, marks['final'] - start
+
+def run_speak_request(url, text, stream, timeout):
+    """Calls /speak and returns (time_to_first_byte, total) in seconds, or None on failure."""
+    start = time.perf_counter()
+    try:
+        response = requests.post(f"{url}/speak", params={'stream': '1'} if stream else None,
+                                 json={'text': text}, stream=True, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        first_byte = None
+        for _ in response.iter_content(chunk_size=4096):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+        return first_byte, time.perf_counter() - start
+    except requests.RequestException:
+        return None
+
+# -----------------------------
+# Load Test
+# -----------------------------
+
+# Load test arguments forwarded to benchmarks.server (fake backend behaviour)
+SERVER_PARAMS = ('interim_every', 'stt_latency', 'stt_final_latency', 'tts_latency',
+                 'failure_rate', 'seed')
+
+def run(args):
+    process, url = serve(args)
+    try:
+        return run_load(args, url)
+    finally:
+        process.terminate()
+        process.wait()
+
+def run_load(args, url):
+    chunks = utterance_audio(args.utterance_seconds, args.chunk_ms)
+
+    usage_before = server_usage(url)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.sessions, 1)) as session_pool, \
+            ThreadPoolExecutor(max_workers=args.speak_concurrency) as speak_pool:
+        sessions = [session_pool.submit(run_recording_session, url, chunks, args.chunk_ms,
+                                        not args.no_realtime, args.timeout)
+                    for _ in range(args.sessions)]
+        speaks = []
+        for i in range(args.speak):
+            text = SPEAK_TEXTS[i % len(SPEAK_TEXTS)]
+            if not args.repeat_texts:
+                text = f"{text} {i}"  # Unique text, so the TTS cache doesn't hide synthesis cost
+            speaks.append(speak_pool.submit(run_speak_request, url, text, args.stream, args.timeout))
+        session_results = [f.result() for f in sessions]
+        speak_results = [f.result() for f in speaks]
+    elapsed = time.perf_counter() - start
+    usage_after = server_usage(url)
+
+    ok_sessions = [r for r in session_results if r]
+    ok_speaks = [r for r in speak_results if r]
+    cpu = usage_after['cpu_s'] - usage_before['cpu_s']
+    return {
+        'params': vars(args),
+        'elapsed_s': elapsed,
+        'stt': {
+            'sessions': args.sessions,
+            'failed': args.sessions - len(ok_sessions),
+            'sessions_per_s': len(ok_sessions) / elapsed,
+            'ttft_s': summarize([r[0] for r in ok_sessions]),
+            'time_to_final_s': summarize([r[1] for r in ok_sessions]),
+        },
+        'tts': {
+            'requests': args.speak,
+            'failed': args.speak - len(ok_speaks),
+            'requests_per_s': len(ok_speaks) / elapsed,
+            'time_to_audio_s': summarize([r[0] for r in ok_speaks]),
+            'total_s': summarize([r[1] for r in ok_speaks]),
+        },
+        # Server process only
+        'cpu_s': cpu,
+        'cpu_utilization': cpu / elapsed,
+        'max_rss_mb': usage_after['max_rss_mb'],
+    }
+
+# -----------------------------
+# Reporting
+# -----------------------------
+
+# (path, higher_is_better) pairs checked by --compare
+COMPARED_METRICS = [
+    (('stt', 'ttft_s', 'p95'), False),
+    (('stt', 'time_to_final_s', 'p95'), False),
+    (('stt', 'sessions_per_s'), True),
+    (('tts', 'time_to_audio_s', 'p95'), False),
+    (('tts', 'total_s', 'p95'), False),
+    (('tts', 'requests_per_s'), True),
+    (('cpu_s',), False),
+    (('max_rss_mb',), False),
+]
+
+# Failure counts are compared absolutely: any increase is a regression, and a
+# baseline of zero failures would make a relative change meaningless
+COMPARED_FAILURES = [('stt', 'failed'), ('tts', 'failed')]
+
+# Arguments that don't change the workload, so they may differ from the baseline's
+UNCOMPARED_PARAMS = {'port', 'timeout', 'output', 'compare', 'tolerance', 'allow_param_mismatch'}
+
+def lookup(results, path):
+    for key in path:
+        results = results.get(key) if results else None
+    return results
+
+def report(results):
+    stt, tts = results['stt'], results['tts']
+    print(f"Elapsed: {results['elapsed_s']:.2f}s  Server CPU: {results['cpu_s']:.2f}s "
+          f"({results['cpu_utilization']:.0%})  Server peak RSS: {results['max_rss_mb']:.0f} MB")
+    print(f"STT: {stt['sessions']} sessions, {stt['failed']} failed, {stt['sessions_per_s']:.1f}/s")
+    for name in ('ttft_s', 'time_to_final_s'):
+        s = stt[name]
+        if s['count']:
+            print(f"  {name:<18} p50 {s['p50'] * 1000:7.1f} ms  p95 {s['p95'] * 1000:7.1f} ms  p99 {s['p99'] * 1000:7.1f} ms")
+    print(f"TTS: {tts['requests']} requests, {tts['failed']} failed, {tts['requests_per_s']:.1f}/s")
+    for name in ('time_to_audio_s', 'total_s'):
+        s = tts[name]
+        if s['count']:
+            print(f"  {name:<18} p50 {s['p50'] * 1000:7.1f} ms  p95 {s['p95'] * 1000:7.1f} ms  p99 {s['p99'] * 1000:7.1f} ms")
+
+def param_differences(results, baseline):
+    """Returns {name: (baseline value, new value)} for workload params that differ."""
+    new, old = results.get('params', {}), baseline.get('params', {})
+    return {name: (old.get(name), new.get(name))
+            for name in sorted((set(new) | set(old)) - UNCOMPARED_PARAMS)
+            if old.get(name) != new.get(name)}
+
+def compare(results, baseline, tolerance):
+    """Prints the change per metric and returns the names that regressed beyond `tolerance`."""
+    regressions = []
+    print(f"Compared with baseline (tolerance {tolerance:.0%}):")
+    for path in COMPARED_FAILURES:
+        new, old = lookup(results, path), lookup(baseline, path)
+        if new is None or old is None:
+            continue
+        flag = "REGRESSION" if new > old else ""
+        print(f"  {'.'.join(path):<26}{old:>12} -> {new:<12}{new - old:+8d}  {flag}")
+        if flag:
+            regressions.append('.'.join(path))
+    for path, higher_is_better in COMPARED_METRICS:
+        new, old = lookup(results, path), lookup(baseline, path)
+        if new is None or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        flag = "REGRESSION" if worse > tolerance else ""
+        print(f"  {'.'.join(path):<26}{old:>12.4f} -> {new:<12.4f}{change:+8.1%}  {flag}")
+        if flag:
+            regressions.append('.'.join(path))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=20, help="simulated recording clients")
+    parser.add_argument('--speak', type=int, default=50, help="total /speak requests")
+    parser.add_argument('--speak-concurrency', type=int, default=10)
+    parser.add_argument('--stream', action='store_true', help="use /speak?stream=1")
+    parser.add_argument('--repeat-texts', action='store_true', help="reuse /speak texts (exercises the TTS cache)")
+    parser.add_argument('--utterance-seconds', type=float, default=2.0)
+    parser.add_argument('--chunk-ms', type=int, default=100)
+    parser.add_argument('--no-realtime', action='store_true', help="send audio as fast as possible")
+    parser.add_argument('--interim-every', type=int, default=3, help="fake STT: requests per interim result")
+    parser.add_argument('--stt-latency', type=float, default=0.05)
+    parser.add_argument('--stt-final-latency', type=float, default=0.15)
+    parser.add_argument('--tts-latency', type=float, default=0.15)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--output', help="write results as JSON")
+    parser.add_argument('--compare', help="baseline JSON from a previous run")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument('--allow-param-mismatch', action='store_true',
+                        help="compare even if the baseline ran a different workload")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        differences = param_differences(results, baseline)
+        for name, (old, new) in differences.items():
+            print(f"Param {name} differs from the baseline: {old!r} -> {new!r}")
+        if differences and not args.allow_param_mismatch:
+            print("Not comparing different workloads (pass --allow-param-mismatch to compare anyway)")
+            return 2
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
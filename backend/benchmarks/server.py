@@ -0,0 +1,66 @@
+"""
+The backend with Google Speech and TTS replaced by the local fakes in
+benchmarks.fakes, run as its own process by benchmarks.load_test so the
+simulated clients don't share its GIL, CPU time or memory.
+
+    python -m benchmarks.server --port 5055
+
+GET /_bench/usage returns the server process's own CPU seconds and peak RSS.
+"""
+import argparse
+import logging
+import resource
+import tempfile
+
+from flask import jsonify
+
+from app import clients, config, create_app, socketio
+from benchmarks.fakes import FakeSpeechClient, FakeTextToSpeechClient
+
+class ClosedWebSocketFilter(logging.Filter):
+    """
+    Drops the traceback Werkzeug logs after every closed WebSocket (the
+    handler returns without a response); real request errors still show.
+    """
+
+    def filter(self, record):
+        error = record.exc_info[1] if record.exc_info else None
+        return not (isinstance(error, AssertionError) and "start_response" in str(error))
+
+def usage():
+    """CPU time and peak memory of this process."""
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    return jsonify({
+        'cpu_s': rusage.ru_utime + rusage.ru_stime,
+        'max_rss_mb': rusage.ru_maxrss / 1024,
+    })
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--interim-every', type=int, default=3, help="fake STT: requests per interim result")
+    parser.add_argument('--stt-latency', type=float, default=0.05)
+    parser.add_argument('--stt-final-latency', type=float, default=0.15)
+    parser.add_argument('--tts-latency', type=float, default=0.15)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config.TTS_CACHE_DIR = tempfile.mkdtemp(prefix="tts-cache-bench-")
+    clients._speech_client = FakeSpeechClient(
+        interim_every=args.interim_every, interim_latency=args.stt_latency,
+        final_latency=args.stt_final_latency, failure_rate=args.failure_rate, seed=args.seed)
+    clients._tts_client = FakeTextToSpeechClient(
+        latency=args.tts_latency, failure_rate=args.failure_rate, seed=args.seed)
+
+    werkzeug_log = logging.getLogger('werkzeug')
+    werkzeug_log.setLevel(logging.ERROR)  # No per-request access log
+    werkzeug_log.addFilter(ClosedWebSocketFilter())
+    app = create_app(warm_up=False)
+    app.add_url_rule('/_bench/usage', 'bench_usage', usage)
+    socketio.run(app, host='127.0.0.1', port=args.port, allow_unsafe_werkzeug=True, log_output=False)
+
+if __name__ == '__main__':
+    main()
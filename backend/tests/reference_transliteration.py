@@ -0,0 +1,106 @@
+"""
+The original character-by-character Sinhala transliteration, kept as the
+golden reference for the compiled engine, and the inputs the tests and
+benchmarks use.
+"""
+import unicodedata
+
+from app.transliteration import (
+    consonants, diacriticsThatRequireA, halKirima, independentVowels, vowelDiacritics,
+)
+
+def reference_transliterate(text):
+    """
+    Convert Sinhala text to a Malay-phonetic transliteration.
+    """
+    # Normalize text (similar to JS .normalize('NFC'))
+    text = unicodedata.normalize('NFC', text)
+    result = ""
+    i = 0
+
+    while i < len(text):
+        ch = text[i]
+
+        # If the character is an independent vowel, append its mapping.
+        if ch in independentVowels:
+            result += independentVowels[ch]
+            i += 1
+            continue
+
+        # If the character is a consonant:
+        if ch in consonants:
+            # Check if a hal kirīma follows to indicate a consonant cluster.
+            if i + 1 < len(text) and text[i + 1] == halKirima:
+                cluster = []
+                # Collect all consonants in the cluster.
+                while i < len(text) and text[i] in consonants and (i + 1 < len(text) and text[i + 1] == halKirima):
+                    cluster.append(consonants[text[i]])
+                    i += 2  # Skip the consonant and the hal kirīma.
+                # Process the base consonant of the cluster.
+                if i < len(text) and text[i] in consonants:
+                    base = consonants[text[i]]
+                    i += 1
+                    # If a vowel diacritic follows, process it.
+                    if i < len(text) and text[i] in vowelDiacritics:
+                        d = text[i]
+                        base += ("a" + vowelDiacritics[d]) if d in diacriticsThatRequireA else vowelDiacritics[d]
+                        i += 1
+                    else:
+                        base += "a"  # Append inherent vowel.
+                    result += "".join(cluster) + base
+                else:
+                    result += "".join(cluster)
+            else:
+                base = consonants[ch]
+                i += 1
+                if i < len(text) and text[i] in vowelDiacritics:
+                    d = text[i]
+                    base += ("a" + vowelDiacritics[d]) if d in diacriticsThatRequireA else vowelDiacritics[d]
+                    i += 1
+                else:
+                    base += "a"  # Append inherent vowel.
+                result += base
+            continue
+
+        # If the character is a vowel diacritic, append its mapping.
+        if ch in vowelDiacritics:
+            result += vowelDiacritics[ch]
+            i += 1
+            continue
+
+        # Skip the hal kirīma if it appears alone.
+        if ch == halKirima:
+            i += 1
+            continue
+
+        # For any other character, just append it as-is.
+        result += ch
+        i += 1
+
+    return result
+
+SHORT_PHRASES = [
+    "ආයුබෝවන්",
+    "ස්තූතියි",
+    "මට උදව් කරන්න",
+    "ඔබට කොහොමද?",
+    "මයික්‍රෆෝනය තට්ටු කරන්න",
+]
+
+LONG_PARAGRAPH = " ".join([
+    "පටිගත කිරීම ආරම්භ කිරීමට මයික්‍රෆෝනය තට්ටු කරන්න.",
+    "ශ්‍රී ලංකාව ඉන්දියන් සාගරයේ පිහිටි දිවයිනකි.",
+    "අපි හෙට උදේ පාසලට යන්නෙමු, ඔබත් එන්න.",
+] * 40)
+
+MIXED_TEXT = " ".join([
+    "Meeting at 10:30 - කරුණාකර වෙලාවට එන්න!",
+    "Room B12 (තෙවන මහල) ready ✔",
+    "email: info@example.com ස්තූතියි.",
+] * 20)
+
+def random_text(rng, length):
+    """Random mix of every Sinhala class the engine handles plus Latin/punctuation."""
+    alphabet = (list(independentVowels) + list(consonants) * 3 + list(vowelDiacritics)
+                + [halKirima] * 4 + ["‍", " ", "a", "Z", "1", ".", "ං"])
+    return "".join(rng.choice(alphabet) for _ in range(length))
@@ -0,0 +1,73 @@
+"""
+Golden-output equivalence between the compiled transliteration engine and the
+original character-by-character implementation, plus pytest-benchmark timings
+for short phrases, a long paragraph and mixed Sinhala/Latin text, each grouped
+with the reference implementation's timing.
+
+    pytest tests/test_transliteration.py --benchmark-only
+"""
+import random
+
+import pytest
+
+from app.transliteration import transliterate_many, transliterate_sinhala
+from tests.reference_transliteration import (
+    LONG_PARAGRAPH, MIXED_TEXT, SHORT_PHRASES, random_text, reference_transliterate,
+)
+
+GOLDEN = [
+    ("ආයුබෝවන්", "aayuboovan"),
+    ("ස්තූතියි", "sthuuthiyi"),
+    ("මට උදව් කරන්න", "mata udav karanna"),
+    ("ඔබට කොහොමද?", "obata kohomada?"),
+    ("මයික්‍රෆෝනය තට්ටු කරන්න", "mayik‍rafoonaya thattu karanna"),
+    ("ක්", "k"),
+    ("ක්ෂ", "kෂ"),
+    ("ශ්‍රී ලංකාව", "ශ‍rii laංkaava"),
+    ("Room B12 (තෙවන මහල)", "Room B12 (thaevana mahala)"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("text, expected", GOLDEN)
+def test_golden_output(text, expected):
+    assert transliterate_sinhala(text) == expected
+    assert reference_transliterate(text) == expected
+
+
+@pytest.mark.parametrize("text", SHORT_PHRASES + [LONG_PARAGRAPH, MIXED_TEXT, "්", "්ක"])
+def test_matches_reference(text):
+    assert transliterate_sinhala(text) == reference_transliterate(text)
+
+
+def test_matches_reference_on_random_input():
+    rng = random.Random(1234)
+    for _ in range(5000):
+        text = random_text(rng, rng.randint(1, 60))
+        assert transliterate_sinhala(text) == reference_transliterate(text), repr(text)
+
+
+def test_transliterate_many_matches_single_calls():
+    texts = SHORT_PHRASES + [MIXED_TEXT, ""]
+    assert transliterate_many(texts) == [reference_transliterate(t) for t in texts]
+
+
+INPUT_CLASSES = [
+    pytest.param(SHORT_PHRASES, id="short-phrases"),
+    pytest.param([LONG_PARAGRAPH], id="long-paragraph"),
+    pytest.param([MIXED_TEXT], id="mixed-sinhala-latin"),
+]
+
+
+@pytest.mark.parametrize("texts", INPUT_CLASSES)
+def test_benchmark_transliterate(benchmark, request, texts):
+    benchmark.group = request.node.callspec.id
+    result = benchmark(transliterate_many, texts)
+    assert result == [reference_transliterate(t) for t in texts]
+
+
+@pytest.mark.parametrize("texts", INPUT_CLASSES)
+def test_benchmark_reference(benchmark, request, texts):
+    """The original implementation, grouped with the compiled one to show the speedup."""
+    benchmark.group = request.node.callspec.id
+    benchmark(lambda: [reference_transliterate(t) for t in texts])
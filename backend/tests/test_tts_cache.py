@@ -0,0 +1,131 @@
+"""
+TTSCache behaviour: single-flight sharing of concurrent misses, and a failing
+disk tier degrading to memory-only instead of failing the request.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from app.tts_cache import DiskStore, TTSCache
+
+AUDIO = b"\xff\xfb" * 100
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSCache(memory_bytes=1024 * 1024, disk_dir=str(tmp_path / "tts"), disk_bytes=1024 * 1024)
+
+
+def test_concurrent_misses_share_one_synthesis(cache):
+    calls = []
+    release = threading.Event()
+
+    def synthesize():
+        calls.append(1)
+        release.wait(5)
+        return AUDIO
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_synthesize("k", synthesize)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    while cache.snapshot()["shared_inflight"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert results == [AUDIO] * 5
+    assert len(calls) == 1
+    assert cache.snapshot()["misses"] == 1
+
+
+def test_synthesis_error_reaches_every_waiter(cache):
+    release = threading.Event()
+
+    def synthesize():
+        release.wait(5)
+        raise RuntimeError("backend down")
+
+    errors = []
+
+    def request():
+        try:
+            cache.get_or_synthesize("k", synthesize)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=request) for _ in range(3)]
+    for t in threads:
+        t.start()
+    while cache.snapshot()["shared_inflight"] < 2:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(errors) == 3
+    assert cache.get_or_synthesize("k", lambda: AUDIO) == AUDIO  # Not cached as a failure
+
+
+def test_hits_memory_then_disk(cache):
+    cache.get_or_synthesize("k", lambda: AUDIO)
+    cache.flush()
+    assert cache.get_or_synthesize("k", pytest.fail) == AUDIO
+    assert cache.snapshot()["memory_hits"] == 1
+
+    cache.memory.entries.clear()
+    assert cache.get_or_synthesize("k", pytest.fail) == AUDIO
+    assert cache.snapshot()["disk_hits"] == 1
+
+
+def test_failed_disk_read_counts_as_miss(cache, monkeypatch):
+    def broken_get(key):
+        raise PermissionError("unreadable")
+
+    monkeypatch.setattr(cache.disk, "get", broken_get)
+    assert cache.get_or_synthesize("k", lambda: AUDIO) == AUDIO
+    stats = cache.snapshot()
+    assert stats["misses"] == 1
+    assert stats["disk_errors"] == 1
+
+
+def test_failed_disk_write_still_serves_and_caches_in_memory(cache, monkeypatch):
+    def full_disk(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("app.tts_cache.os.fdopen", full_disk)
+    assert cache.get_or_synthesize("k", lambda: AUDIO) == AUDIO
+    cache.flush()
+    assert cache.snapshot()["disk_errors"] == 1
+    assert cache.get_or_synthesize("k", pytest.fail) == AUDIO
+    # The partial temp file is removed and nothing is indexed
+    assert os.listdir(cache.disk.directory) == []
+    assert cache.disk.size == 0
+
+
+def test_unusable_disk_dir_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_bytes(b"")
+    cache = TTSCache(memory_bytes=1024, disk_dir=str(blocker / "tts"), disk_bytes=1024)
+    assert cache.disk is None
+    assert cache.get_or_synthesize("k", lambda: AUDIO[:64]) == AUDIO[:64]
+
+
+def test_disk_store_evicts_least_recently_used_to_low_water(tmp_path):
+    store = DiskStore(str(tmp_path), max_bytes=1000, low_water=0.6)
+    for key in "abcd":
+        store.put(key, b"x" * 200)
+    store.get("a")  # Now the most recently used
+    assert store.put("e", b"x" * 200) == 0
+    assert store.put("f", b"x" * 200) == 3  # 1200 bytes -> at most 600
+    assert list(store.index) == ["a", "e", "f"]
+    assert sorted(os.listdir(tmp_path)) == ["a.mp3", "e.mp3", "f.mp3"]
+    assert store.size == 600
+
+    reopened = DiskStore(str(tmp_path), max_bytes=1000)
+    assert reopened.size == 600
+    assert reopened.get("f") == b"x" * 200
@@ -0,0 +1,58 @@
+"""VAD threshold updates: values are validated together and applied all or nothing."""
+import math
+
+import pytest
+
+from app import config, create_app, socketio
+from app.vad import VoiceActivityGate
+
+
+def test_configure_applies_every_value():
+    gate = VoiceActivityGate(frame_ms=20)
+    gate.configure(energy_threshold="250", zcr_threshold=0.3, hangover_ms=400, preroll_ms=100)
+    assert gate.energy_threshold == 250.0
+    assert gate.zcr_threshold == 0.3
+    assert gate.hangover_frames == 20
+    assert gate.preroll.maxlen == 5
+
+
+@pytest.mark.parametrize("bad", [
+    {"hangover_ms": "x"},
+    {"preroll_ms": -20},
+    {"zcr_threshold": math.nan},
+    {"hangover_ms": math.inf},
+    {"preroll_ms": [200]},
+])
+def test_invalid_value_leaves_gate_unchanged(bad):
+    gate = VoiceActivityGate()
+    before = (gate.energy_threshold, gate.zcr_threshold, gate.hangover_frames, gate.preroll.maxlen)
+    with pytest.raises(ValueError):
+        gate.configure(energy_threshold=100, **bad)
+    assert (gate.energy_threshold, gate.zcr_threshold, gate.hangover_frames, gate.preroll.maxlen) == before
+
+
+@pytest.fixture
+def client():
+    client = socketio.test_client(create_app(warm_up=False))
+    yield client
+    client.disconnect()
+
+
+def received(client, name):
+    return [e["args"][0] for e in client.get_received() if e["name"] == name]
+
+
+def test_vad_config_event_rejects_partial_update(client):
+    from app.routes import recognizers
+
+    client.emit("vad_config", {"energy_threshold": 100, "hangover_ms": "x"})
+    assert received(client, "error")
+    [gate] = recognizers.gates.values()
+    assert gate.energy_threshold == config.VAD_ENERGY_THRESHOLD
+
+
+@pytest.mark.parametrize("payload", [["bad"], "energy_threshold=100", None])
+def test_vad_config_event_rejects_non_object(client, payload):
+    client.emit("vad_config", payload)
+    events = client.get_received()
+    assert [e["name"] for e in events] == ["error"]